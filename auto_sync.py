@@ -6,23 +6,34 @@ Periodically sync Cursor settings to Google Drive
 """
 
 import os
-import json
 import logging
+import subprocess
+import sys
 import time
 from datetime import datetime
-from cursor_sync import CursorSyncManager
+from cursor_sync import CursorSyncManager, load_json
+
+try:
+    # PyObjC, only available on macOS
+    from Foundation import NSUserNotification, NSUserNotificationCenter
+except ImportError:
+    NSUserNotification = None
+
+# Sync half as often when there has been no user input for this long
+IDLE_THRESHOLD_SECONDS = 30 * 60
 
 class AutoSyncManager:
     def __init__(self, config_path='config.json'):
         self.config_path = os.path.abspath(config_path)
         self.config = self._load_config()
+        self._sync_manager = None
         self._setup_logging()
         
     def _load_config(self):
         """Load configuration file"""
         try:
             with open(self.config_path, 'r') as f:
-                return json.load(f)
+                return load_json(f)
         except FileNotFoundError:
             print(f"Configuration file {self.config_path} does not exist, using default settings")
             return {
@@ -64,10 +75,28 @@ class AutoSyncManager:
         if not self.config['notification_settings']['enable_notifications']:
             return
         
+        if sys.platform != 'darwin':
+            return
+        
+        if NSUserNotification is not None:
+            # Deliver in-process; the center is None when Python runs without an app bundle
+            center = NSUserNotificationCenter.defaultUserNotificationCenter()
+            if center is not None:
+                notification = NSUserNotification.alloc().init()
+                notification.setTitle_(title)
+                notification.setInformativeText_(message)
+                center.deliverNotification_(notification)
+                return
+        
+        def quote(text):
+            # Escape for an AppleScript string literal
+            return '"' + str(text).replace('\\', '\\\\').replace('"', '\\"') + '"'
+        
         try:
-            # macOS notification
-            os.system(f'osascript -e \'display notification "{message}" with title "{title}"\'')
-        except:
+            # macOS notification, run osascript directly instead of through a shell
+            subprocess.run(['osascript', '-e', f'display notification {quote(message)} with title {quote(title)}'],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError:
             pass
     
     def _cleanup_old_backups(self, sync_manager):
@@ -76,23 +105,11 @@ class AutoSyncManager:
         folder_name = self.config['sync_settings']['backup_folder_name']
         
         try:
-            folder_id = sync_manager._get_or_create_folder(folder_name)
-            
-            # Search for all backup files
-            results = sync_manager.service.files().list(
-                q=f"parents='{folder_id}' and name contains 'cursor_backup'",
-                orderBy='createdTime desc',
-                fields='files(id, name, createdTime)'
-            ).execute()
-            
-            files = results.get('files', [])
-            
-            # If exceeding maximum backup count, delete old backups
-            if len(files) > max_backups:
-                files_to_delete = files[max_backups:]
-                for file_to_delete in files_to_delete:
-                    sync_manager.service.files().delete(fileId=file_to_delete['id']).execute()
-                    self.logger.info(f"Deleted old backup: {file_to_delete['name']}")
+            deleted, failed = sync_manager.prune_old_backups(keep=max_backups, folder_name=folder_name)
+            for name in deleted:
+                self.logger.info(f"Deleted old backup: {name}")
+            for name, error in failed:
+                self.logger.error(f"Failed to delete old backup {name}: {str(error)}")
         
         except Exception as e:
             self.logger.error(f"Error occurred while cleaning up old backups: {str(e)}")
@@ -103,18 +120,20 @@ class AutoSyncManager:
             credentials_file = self.config['paths']['credentials_file']
             token_file = self.config['paths']['token_file']
             
-            sync_manager = CursorSyncManager(credentials_file, token_file)
-            
             # Check if credentials file exists
             if not os.path.exists(credentials_file):
                 self.logger.error(f"Credentials file {credentials_file} does not exist")
                 return False
             
-            # Authentication
+            # Reuse the manager and its Drive service across sync cycles; authenticate()
+            # returns early while the token is good and refreshes it shortly before expiry
+            if self._sync_manager is None:
+                self._sync_manager = CursorSyncManager(credentials_file, token_file, self.config_path)
+            sync_manager = self._sync_manager
             sync_manager.authenticate()
             
             # Execute sync
-            file_id = sync_manager.sync_up()
+            file_id = sync_manager.sync_up(self.config['sync_settings']['backup_folder_name'])
             
             # Clean up old backups
             self._cleanup_old_backups(sync_manager)
@@ -129,11 +148,47 @@ class AutoSyncManager:
         except Exception as e:
             self.logger.error(f"Sync failed: {str(e)}")
             
+            # Start over with a fresh authentication on the next cycle
+            self._sync_manager = None
+            
             if self.config['notification_settings']['error_notification']:
                 self._send_notification("Cursor Sync Error", f"Sync failed: {str(e)}")
             
             return False
     
+    def _get_idle_seconds(self):
+        """Get seconds since the last user input, or None if it cannot be determined"""
+        try:
+            if sys.platform == 'darwin':
+                output = subprocess.run(['ioreg', '-c', 'IOHIDSystem', '-d', '4'],
+                                        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                        universal_newlines=True, check=True).stdout
+                for line in output.splitlines():
+                    if '"HIDIdleTime"' in line:
+                        return int(line.rsplit('=', 1)[1]) / 1e9
+            elif sys.platform.startswith('linux'):
+                output = subprocess.run(['xprintidle'],
+                                        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                        universal_newlines=True, check=True).stdout
+                return int(output.strip()) / 1000
+        except (OSError, subprocess.CalledProcessError, ValueError):
+            pass
+        return None
+    
+    def _schedule_next_run(self, last_run, interval):
+        """Get the monotonic time of the next sync"""
+        idle = self._get_idle_seconds()
+        if idle is not None and idle > IDLE_THRESHOLD_SECONDS:
+            interval *= 2
+        
+        # Advance from the previous slot rather than from now, so the time spent
+        # syncing does not accumulate as drift; slots missed while asleep are skipped
+        next_run = last_run + interval
+        now = time.monotonic()
+        while next_run <= now:
+            next_run += interval
+        return next_run
+    
     def start_auto_sync(self):
         """Start automatic sync"""
         if not self.config['sync_settings']['auto_sync']:
@@ -141,19 +196,24 @@ class AutoSyncManager:
             return
         
         interval = self.config['sync_settings']['sync_interval_minutes'] * 60
+        if interval <= 0:
+            self.logger.error("sync_interval_minutes must be greater than 0")
+            return
         
         self.logger.info(f"Starting automatic sync, interval: {interval/60} minutes")
         
-        while True:
-            try:
-                self.sync_once()
-                time.sleep(interval)
-            except KeyboardInterrupt:
-                self.logger.info("Automatic sync stopped")
-                break
-            except Exception as e:
-                self.logger.error(f"Automatic sync error occurred: {str(e)}")
-                time.sleep(interval)
+        next_run = time.monotonic()
+        try:
+            while True:
+                try:
+                    self.sync_once()
+                except Exception as e:
+                    self.logger.error(f"Automatic sync error occurred: {str(e)}")
+                
+                next_run = self._schedule_next_run(next_run, interval)
+                time.sleep(max(0, next_run - time.monotonic()))
+        except KeyboardInterrupt:
+            self.logger.info("Automatic sync stopped")
 
 def main():
     import argparse
@@ -6,80 +6,441 @@ Automatically sync Cursor editor settings to Google Drive
 """
 
 import os
+import errno
 import json
+import hashlib
 import shutil
+import stat
 import time
 import platform
-from datetime import datetime
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from datetime import datetime, timedelta, timezone
+from itertools import islice
 from pathlib import Path
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
 import io
 import zipfile
 import tempfile
 
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from isal import isal_zlib
+except ImportError:
+    isal_zlib = None
+
 # Google Drive API scopes
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
 
+# Backups larger than this are spilled from memory to a temporary file
+SPOOL_MAX_SIZE = 256 * 1024 * 1024
+
+# Smaller uploads are sent in a single request instead of a resumable session
+RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+
+# Resumable upload chunk size (must be a multiple of 256 KiB)
+UPLOAD_CHUNK_SIZE = 16 * 1024 * 1024
+
+# DEFLATE by default so backups restore on any Python version and open with stock unzip tools.
+# Zstandard is much faster but needs Python 3.14+ everywhere the backup is restored, so it is
+# opt-in through backup.compression in config.json
+ARCHIVE_COMPRESSION = zipfile.ZIP_DEFLATED
+COMPRESSION_METHODS = {
+    'deflate': zipfile.ZIP_DEFLATED,
+    'zstd': getattr(zipfile, 'ZIP_ZSTANDARD', None)
+}
+
+# Favor compression speed over size, backups are compressed on every sync
+ARCHIVE_COMPRESSLEVEL = 1
+
+# Errors for which settings are copied aside because they cannot be renamed
+RENAME_FALLBACK_ERRNOS = frozenset({errno.EXDEV, errno.EACCES, errno.EBUSY})
+
+# Configurations that are a single file rather than a directory
+FILE_CONFIGS = frozenset({'settings', 'keybindings'})
+
+# Names of the per-subtree objects used by incremental sync
+INDEX_FILENAME = 'cursor_index.json'
+SUBTREE_FILENAME = 'cursor_subtree_{}.zip'
+
+# Number of threads copying files during restore (I/O bound, so more than the core count)
+RESTORE_WORKERS = 32
+
+# Content hash used by incremental sync (BLAKE3 uses SIMD and is faster when installed)
+HASH_NAME = 'blake3' if blake3 is not None else 'sha256'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Regenerable caches and logs left out of backups by default (see backup.exclude in config.json)
+EXCLUDE_DIRS = frozenset({
+    'Cache', 'CachedData', 'CachedExtensions', 'CachedExtensionVSIXs', 'Code Cache',
+    'GPUCache', 'DawnCache', 'Service Worker', 'blob_storage', 'Crashpad', 'logs',
+    '.cache', '.vscode-test'
+})
+EXCLUDE_EXTENSIONS = frozenset({'.log'})
+
+# Already-compressed formats that are stored as-is instead of being compressed again
+INCOMPRESSIBLE_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.ico', '.woff', '.woff2', '.vsix', '.zip',
+    '.gz', '.br', '.zst', '.mp4', '.webm', '.webp'
+})
+
+# Files at least this large are streamed into the archive instead of read into memory
+STREAM_THRESHOLD = 1024 * 1024
+
+# Buffer size used when streaming files into the archive
+STREAM_BUFFER_SIZE = 1024 * 1024
+
+# Bytes requested per os.copy_file_range call when copying files
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Number of threads reading files while the archive is being compressed
+READ_WORKERS = max(8, os.cpu_count() or 1)
+
+# Maximum number of files read ahead of the writer, bounds memory held by pending reads
+READ_AHEAD = 2 * READ_WORKERS
+
+# Google Drive API accepts at most 100 calls per batch request
+BATCH_SIZE = 100
+
+# Largest page size accepted by files().list
+MAX_PAGE_SIZE = 1000
+
+# Access tokens this close to expiry are refreshed ahead of time instead of failing mid-sync
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+# One lock per token file so concurrent authentications don't refresh the same token twice
+_REFRESH_LOCKS = {}
+_REFRESH_LOCKS_GUARD = threading.Lock()
+
+def _refresh_lock(token_path):
+    """Get the refresh lock for a token file"""
+    with _REFRESH_LOCKS_GUARD:
+        return _REFRESH_LOCKS.setdefault(os.path.abspath(token_path), threading.Lock())
+
+def _needs_refresh(creds):
+    """Check whether credentials are invalid or about to expire"""
+    if not creds.valid:
+        return True
+    # google-auth stores expiry as a naive UTC datetime
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return creds.expiry is not None and creds.expiry - now < TOKEN_REFRESH_MARGIN
+
+def _quote(value):
+    """Quote a value as a Drive query string literal"""
+    return "'" + str(value).replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+def load_json(f):
+    """Parse JSON from an open file, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(f.read())
+    return json.load(f)
+
+def dump_json(obj, f, indent=None):
+    """Write JSON to an open text file, using orjson when it is installed"""
+    if orjson is not None:
+        f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode('utf-8'))
+    else:
+        json.dump(obj, f, indent=indent)
+
+# Operating system and home directory do not change while the process runs
+_SYSTEM = platform.system().lower()
+_HOME = os.path.expanduser('~')
+
+def _user_paths(user_dir):
+    """Get Cursor configuration file paths under a Cursor user directory"""
+    return {
+        'settings': f'{user_dir}/settings.json',
+        'keybindings': f'{user_dir}/keybindings.json',
+        'snippets': f'{user_dir}/snippets/',
+        'extensions': f'{user_dir}/extensions/',
+        'workspaceStorage': f'{user_dir}/workspaceStorage/'
+    }
+
+# Default Cursor configuration file paths for each supported operating system
+_DEFAULT_PATHS_BY_OS = {
+    'darwin': _user_paths(f'{_HOME}/Library/Application Support/Cursor/User'),  # macOS
+    'linux': _user_paths(f'{_HOME}/.config/Cursor/User'),  # Linux
+    'windows': _user_paths(f'{_HOME}/AppData/Roaming/Cursor/User')  # Windows
+}
+
+def _scan_files(path, exclude_dirs=frozenset(), exclude_extensions=frozenset()):
+    """Recursively yield DirEntry objects for all files under a directory"""
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in exclude_dirs:
+                    yield from _scan_files(entry.path, exclude_dirs, exclude_extensions)
+            elif entry.is_file():
+                if os.path.splitext(entry.name)[1].lower() not in exclude_extensions:
+                    yield entry
+
+def _zip_info(arcname, st):
+    """Build zip entry info from an existing stat result (like ZipInfo.from_file)"""
+    zinfo = zipfile.ZipInfo(arcname, time.localtime(st.st_mtime)[:6])
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+    zinfo.file_size = st.st_size
+    return zinfo
+
+def _new_hash():
+    """Create a content hasher for HASH_NAME"""
+    return blake3.blake3() if blake3 is not None else hashlib.sha256()
+
+def _file_digest(file_path):
+    """Hash file content, reading into a reusable buffer"""
+    # Not memory-mapped: workspaceStorage holds live SQLite files that Cursor may
+    # truncate while they are hashed, which kills a process reading a mapping with SIGBUS
+    h = _new_hash()
+    buf = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buf)
+    with open(file_path, 'rb', buffering=0) as f:
+        for n in iter(lambda: f.readinto(buf), 0):
+            h.update(view[:n])
+    return h.hexdigest()
+
+def _fastcopy(src, dst):
+    """Copy file content, inside the kernel where the platform allows it"""
+    if not hasattr(os, 'copy_file_range'):
+        # shutil.copyfile already uses fcopyfile on macOS
+        shutil.copyfile(src, dst)
+        return
+    
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            while os.copy_file_range(fsrc.fileno(), fdst.fileno(), COPY_CHUNK_SIZE):
+                pass
+        except OSError:
+            # Not supported between these file systems, copy through user space instead
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst, STREAM_BUFFER_SIZE)
+
+def _copy_file(src, dst):
+    """Copy file content, permission bits and timestamps"""
+    _fastcopy(src, dst)
+    shutil.copystat(src, dst)
+
+def _parallel_copytree(src, dst, executor):
+    """Copy a directory tree, creating directories up front and copying the files on an executor"""
+    futures = []
+    
+    def copy_dir(src_dir, dst_dir):
+        os.makedirs(dst_dir, exist_ok=True)
+        with os.scandir(src_dir) as it:
+            for entry in it:
+                target = os.path.join(dst_dir, entry.name)
+                if entry.is_dir():
+                    copy_dir(entry.path, target)
+                elif entry.is_file():
+                    futures.append(executor.submit(_copy_file, entry.path, target))
+    
+    copy_dir(src, dst)
+    
+    # Surface the first copy error, if any
+    for future in as_completed(futures):
+        future.result()
+
+@contextlib.contextmanager
+def _fast_deflate():
+    """Let zipfile compress DEFLATE entries with ISA-L while the block runs, when it is installed"""
+    # zipfile creates its DEFLATE compressors through its zlib module; ISA-L's SIMD
+    # implementation is several times faster but only supports levels 0-3, so it is
+    # swapped in just for backups instead of for every ZipFile in the process
+    if isal_zlib is None:
+        yield
+        return
+    original = zipfile.zlib
+    zipfile.zlib = isal_zlib
+    try:
+        yield
+    finally:
+        zipfile.zlib = original
+
+def _remove_path(path):
+    """Remove a file or directory tree"""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.unlink(path)
+
+def _unused_path(path):
+    """Get path, or path with a numeric suffix if something already exists there"""
+    candidate = path
+    counter = 1
+    while os.path.lexists(candidate):
+        candidate = f"{path}_{counter}"
+        counter += 1
+    return candidate
+
+def _compress_type(arcname, compression=ARCHIVE_COMPRESSION):
+    """Choose the compression method for an archive entry"""
+    if os.path.splitext(arcname)[1].lower() in INCOMPRESSIBLE_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return compression
+
+def _extract_member(zipf, info, target):
+    """Extract one archive member to target, restoring its permissions and modification time"""
+    # ZipExtFile is slow at small reads, so read it through a large buffer
+    with io.BufferedReader(zipf.open(info), buffer_size=STREAM_BUFFER_SIZE) as src, \
+            open(target, 'wb', buffering=STREAM_BUFFER_SIZE) as dst:
+        shutil.copyfileobj(src, dst, STREAM_BUFFER_SIZE)
+    
+    mode = info.external_attr >> 16
+    if mode:
+        os.chmod(target, stat.S_IMODE(mode))
+    mtime = time.mktime(info.date_time + (0, 0, -1))
+    os.utime(target, (mtime, mtime))
+
+def _read_archive_entry(file_path, arcname, st):
+    """Read a file for the backup archive, returning its zip entry info and content (None if it vanished)"""
+    try:
+        with open(file_path, 'rb') as f:
+            return _zip_info(arcname, st), f.read()
+    except FileNotFoundError:
+        # e.g. SQLite journals in workspaceStorage come and go while Cursor runs
+        print(f"Skipping file removed during backup: {file_path}")
+        return None
+
 class CursorSyncManager:
-    def __init__(self, credentials_path='credentials.json', token_path='token.json', config_path='config.json'):
+    def __init__(self, credentials_path='credentials.json', token_path='token.json', config_path='config.json',
+                 manifest_path=None):
         self.credentials_path = credentials_path
         self.token_path = token_path
         self.config_path = config_path
         self.service = None
-        self.cursor_config_paths = self._get_cursor_config_paths()
+        self._creds = None
+        self._folder_id_cache = {}
+        config = self._read_config()
+        self.cursor_config_paths = self._get_cursor_config_paths(config)
+        self.exclude_dirs, self.exclude_extensions = self._get_backup_excludes(config)
+        self.compression = self._get_backup_compression(config)
+        # Machine-specific state lives next to the token, config.json is left to the user
+        self.state_path = self._sidecar_path('state')
+        # Record of the files in the last uploaded backup, per token so accounts never share it
+        self.manifest_path = manifest_path or self._sidecar_path('manifest')
+        self.index_cache_path = self._sidecar_path('index')
+        try:
+            state = self._read_state()
+        except ValueError as e:
+            print(f"Error reading sync state file: {e}")
+            state = {}
+        self._saved_folder_ids = state.get('drive_folder_ids', {})
+        self._last_applied_md5 = state.get('last_applied_md5')
+        self._downloaded_md5 = None
         
-    def _get_cursor_config_paths(self):
-        """Get Cursor configuration file paths"""
-        # Try to read custom paths from configuration file
+    def _read_config(self):
+        """Read configuration file, returning an empty dict if unavailable"""
         try:
             if os.path.exists(self.config_path):
                 with open(self.config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    cursor_paths = config.get('cursor_paths', {})
-                    
-                    if cursor_paths.get('custom_enabled', False):
-                        # Use custom paths
-                        custom_paths = {}
-                        for key in ['settings', 'keybindings', 'snippets', 'extensions', 'workspaceStorage']:
-                            path = cursor_paths.get(key)
-                            if path:
-                                custom_paths[key] = os.path.expanduser(path)
-                        
-                        if custom_paths:
-                            return custom_paths
+                    return load_json(f)
         except Exception as e:
             print(f"Error reading configuration file: {e}")
+        return {}
+    
+    def _sidecar_path(self, name):
+        """Get the path of a local state file stored next to the token file"""
+        return f"{os.path.splitext(self.token_path)[0]}_{name}.json"
+    
+    def _read_state(self):
+        """Read the sync state file, raising ValueError if it exists but cannot be parsed"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return load_json(f)
+        except FileNotFoundError:
+            return {}
+    
+    def _update_state(self, key, value):
+        """Store a value in the sync state file, keeping the rest of its content"""
+        try:
+            # Never overwrite a file that could not be read, its content would be lost
+            state = self._read_state()
+            state[key] = value
+            temp_path = f"{self.state_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                dump_json(state, f, indent=2)
+            os.replace(temp_path, self.state_path)
+        except (OSError, ValueError) as e:
+            print(f"Error updating sync state file: {e}")
+    
+    def _get_cursor_config_paths(self, config):
+        """Get Cursor configuration file paths"""
+        # Try to read custom paths from configuration file
+        cursor_paths = config.get('cursor_paths', {})
+        
+        if cursor_paths.get('custom_enabled', False):
+            # Use custom paths
+            custom_paths = {}
+            for key in ['settings', 'keybindings', 'snippets', 'extensions', 'workspaceStorage']:
+                path = cursor_paths.get(key)
+                if path:
+                    custom_paths[key] = os.path.expanduser(path)
+            
+            if custom_paths:
+                return custom_paths
         
         # Use default paths (based on operating system)
         return self._get_default_cursor_paths()
     
+    def _get_backup_excludes(self, config):
+        """Get directory names and file extensions left out of backups"""
+        exclude = config.get('backup', {}).get('exclude', {})
+        exclude_dirs = exclude.get('dirs')
+        exclude_extensions = exclude.get('extensions')
+        
+        return (
+            frozenset(exclude_dirs) if exclude_dirs is not None else EXCLUDE_DIRS,
+            frozenset(ext.lower() for ext in exclude_extensions)
+            if exclude_extensions is not None else EXCLUDE_EXTENSIONS
+        )
+    
+    def _get_backup_compression(self, config):
+        """Get the zip compression method for new backups"""
+        name = config.get('backup', {}).get('compression', 'deflate')
+        compression = COMPRESSION_METHODS.get(name)
+        if compression is None:
+            print(f"Compression method {name!r} is not available, using deflate")
+            return ARCHIVE_COMPRESSION
+        return compression
+    
     def validate_paths(self):
         """Validate Cursor configuration file paths"""
         validation_results = {}
         
         for name, path in self.cursor_config_paths.items():
+            # One stat per path; file type is derived from its mode
+            try:
+                st = os.stat(path)
+            except OSError:
+                st = None
+            
             validation_results[name] = {
                 'path': path,
-                'exists': os.path.exists(path),
+                'exists': st is not None,
                 'readable': False,
                 'writable': False,
                 'is_file': False,
                 'is_dir': False
             }
             
-            if os.path.exists(path):
+            if st is not None:
+                is_file = stat.S_ISREG(st.st_mode)
+                is_dir = stat.S_ISDIR(st.st_mode)
                 validation_results[name]['readable'] = os.access(path, os.R_OK)
-                validation_results[name]['is_file'] = os.path.isfile(path)
-                validation_results[name]['is_dir'] = os.path.isdir(path)
+                validation_results[name]['is_file'] = is_file
+                validation_results[name]['is_dir'] = is_dir
                 
                 # Check write permissions
-                if os.path.isfile(path):
-                    validation_results[name]['writable'] = os.access(path, os.W_OK)
-                elif os.path.isdir(path):
+                if is_file or is_dir:
                     validation_results[name]['writable'] = os.access(path, os.W_OK)
                 else:
                     # Check parent directory write permissions
@@ -113,79 +474,111 @@ class CursorSyncManager:
     
     def _get_default_cursor_paths(self):
         """Get default Cursor configuration file paths"""
-        system = platform.system().lower()
-        
-        if system == 'darwin':  # macOS
-            return {
-                'settings': os.path.expanduser('~/Library/Application Support/Cursor/User/settings.json'),
-                'keybindings': os.path.expanduser('~/Library/Application Support/Cursor/User/keybindings.json'),
-                'snippets': os.path.expanduser('~/Library/Application Support/Cursor/User/snippets/'),
-                'extensions': os.path.expanduser('~/Library/Application Support/Cursor/User/extensions/'),
-                'workspaceStorage': os.path.expanduser('~/Library/Application Support/Cursor/User/workspaceStorage/')
-            }
-        elif system == 'linux':  # Linux
-            return {
-                'settings': os.path.expanduser('~/.config/Cursor/User/settings.json'),
-                'keybindings': os.path.expanduser('~/.config/Cursor/User/keybindings.json'),
-                'snippets': os.path.expanduser('~/.config/Cursor/User/snippets/'),
-                'extensions': os.path.expanduser('~/.config/Cursor/User/extensions/'),
-                'workspaceStorage': os.path.expanduser('~/.config/Cursor/User/workspaceStorage/')
-            }
-        elif system == 'windows':  # Windows
-            return {
-                'settings': os.path.expanduser('~/AppData/Roaming/Cursor/User/settings.json'),
-                'keybindings': os.path.expanduser('~/AppData/Roaming/Cursor/User/keybindings.json'),
-                'snippets': os.path.expanduser('~/AppData/Roaming/Cursor/User/snippets/'),
-                'extensions': os.path.expanduser('~/AppData/Roaming/Cursor/User/extensions/'),
-                'workspaceStorage': os.path.expanduser('~/AppData/Roaming/Cursor/User/workspaceStorage/')
-            }
-        else:
-            raise Exception(f"Unsupported operating system: {system}")
+        if _SYSTEM not in _DEFAULT_PATHS_BY_OS:
+            raise Exception(f"Unsupported operating system: {_SYSTEM}")
+        
+        # Copy so callers can't modify the shared dict
+        return dict(_DEFAULT_PATHS_BY_OS[_SYSTEM])
     
     def authenticate(self):
         """Google Drive API authentication"""
+        # Google client libraries are slow to import, so they are only loaded when needed
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from google.auth.transport.requests import Request
+        from googleapiclient.discovery import build
+        
+        # Already authenticated with credentials that are still good, keep the built service
+        if self.service is not None and self._creds is not None and not _needs_refresh(self._creds):
+            return True
+        
         creds = None
         
         if os.path.exists(self.token_path):
             creds = Credentials.from_authorized_user_file(self.token_path, SCOPES)
         
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    self.credentials_path, SCOPES)
-                creds = flow.run_local_server(port=0)
-            
-            with open(self.token_path, 'w') as token:
-                token.write(creds.to_json())
+        # A token that is not close to expiry is used as is, token.json is only rewritten when it changes
+        if not creds or _needs_refresh(creds):
+            with _refresh_lock(self.token_path):
+                # Another thread may have refreshed the token while this one waited for the lock
+                if os.path.exists(self.token_path):
+                    creds = Credentials.from_authorized_user_file(self.token_path, SCOPES)
+                
+                if creds and creds.refresh_token and _needs_refresh(creds):
+                    creds.refresh(Request())
+                    self._save_token(creds)
+                elif not creds or not creds.valid:
+                    flow = InstalledAppFlow.from_client_secrets_file(
+                        self.credentials_path, SCOPES)
+                    creds = flow.run_local_server(port=0)
+                    self._save_token(creds)
+                # Otherwise the token is valid but cannot be refreshed early, use it until it expires
         
-        self.service = build('drive', 'v3', credentials=creds)
+        # Use the discovery document bundled with google-api-python-client instead of fetching it
+        self.service = build('drive', 'v3', credentials=creds, static_discovery=True, cache_discovery=False)
+        self._creds = creds
         return True
     
-    def create_backup_archive(self):
-        """Create Cursor configuration backup file"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    def _save_token(self, creds):
+        """Atomically replace the token file so a crash never leaves it half-written"""
+        temp_path = f"{self.token_path}.tmp"
+        with open(temp_path, 'w') as token:
+            token.write(creds.to_json())
+        os.replace(temp_path, self.token_path)
+    
+    def create_backup_archive(self, config_names=None):
+        """Create Cursor configuration backup file (optionally only for some configs)"""
+        now = datetime.now()
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
         backup_filename = f'cursor_backup_{timestamp}.zip'
         
-        # Use NamedTemporaryFile instead of TemporaryDirectory to avoid automatic file deletion
-        temp_file = tempfile.NamedTemporaryFile(suffix='.zip', delete=False)
-        backup_path = temp_file.name
-        temp_file.close()  # Close file handle so zipfile can use it
-        
-        with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Backup configuration files
-            for config_name, config_path in self.cursor_config_paths.items():
-                if os.path.exists(config_path):
-                    if os.path.isfile(config_path):
-                        zipf.write(config_path, f'{config_name}/{os.path.basename(config_path)}')
-                    elif os.path.isdir(config_path):
-                        for root, dirs, files in os.walk(config_path):
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                arcname = os.path.join(config_name, 
-                                                     os.path.relpath(file_path, config_path))
-                                zipf.write(file_path, arcname)
+        # Build the archive in memory so it can be uploaded without a disk round-trip;
+        # only very large backups roll over to a temporary file
+        backup_file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, suffix='.zip')
+        
+        # Collect configuration files to back up
+        entries = list(self._iter_config_files(config_names))
+        
+        with _fast_deflate(), zipfile.ZipFile(backup_file, 'w', self.compression,
+                                              compresslevel=ARCHIVE_COMPRESSLEVEL) as zipf:
+            def write_entry(future):
+                entry = future.result()
+                if entry is None:
+                    return
+                zinfo, data = entry
+                zipf.writestr(zinfo, data, compress_type=_compress_type(zinfo.filename, self.compression),
+                              compresslevel=ARCHIVE_COMPRESSLEVEL)
+            
+            def stream_entry(file_path, arcname, st):
+                # Copy large files in big chunks rather than loading them whole
+                zinfo = _zip_info(arcname, st)
+                zinfo.compress_type = _compress_type(arcname, self.compression)
+                zinfo._compresslevel = ARCHIVE_COMPRESSLEVEL
+                try:
+                    src = open(file_path, 'rb', buffering=STREAM_BUFFER_SIZE)
+                except FileNotFoundError:
+                    print(f"Skipping file removed during backup: {file_path}")
+                    return
+                with src, zipf.open(zinfo, 'w', force_zip64=True) as dst:
+                    shutil.copyfileobj(src, dst, STREAM_BUFFER_SIZE)
+            
+            # Read small files on worker threads while this thread compresses and writes them.
+            # The number of in-flight reads is bounded to keep memory usage in check.
+            with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+                pending = set()
+                for file_path, arcname, st in entries:
+                    if st.st_size >= STREAM_THRESHOLD:
+                        stream_entry(file_path, arcname, st)
+                        continue
+                    
+                    pending.add(executor.submit(_read_archive_entry, file_path, arcname, st))
+                    if len(pending) >= READ_AHEAD:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            write_entry(future)
+                
+                for future in as_completed(pending):
+                    write_entry(future)
             
             # Add metadata
             metadata = {
@@ -194,12 +587,60 @@ class CursorSyncManager:
                 'cursor_version': self._get_cursor_version()
             }
             
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as meta_file:
-                json.dump(metadata, meta_file, indent=2)
-                zipf.write(meta_file.name, 'metadata.json')
-                os.unlink(meta_file.name)
+            # Written straight from memory, stamped with the backup time
+            meta_info = zipfile.ZipInfo('metadata.json', date_time=now.timetuple()[:6])
+            zipf.writestr(meta_info, json.dumps(metadata, indent=2), compress_type=self.compression,
+                          compresslevel=ARCHIVE_COMPRESSLEVEL)
         
-        return backup_path, backup_filename
+        return backup_file, backup_filename
+    
+    def _iter_config_files(self, config_names=None):
+        """Yield (file path, archive name, stat result) for every file to back up"""
+        for config_name, config_path in self.cursor_config_paths.items():
+            if config_names is not None and config_name not in config_names:
+                continue
+            
+            try:
+                st = os.stat(config_path)
+            except OSError:
+                continue
+            
+            if stat.S_ISREG(st.st_mode):
+                yield config_path, f'{config_name}/{os.path.basename(config_path)}', st
+            elif stat.S_ISDIR(st.st_mode):
+                # DirEntry caches its type and stat info, so each file is stat'ed at most once
+                prefix_len = len(os.path.join(config_path, ''))
+                for entry in _scan_files(config_path, self.exclude_dirs, self.exclude_extensions):
+                    # Archive names always use '/', so hashes and index keys match across platforms
+                    rel_path = entry.path[prefix_len:].replace(os.sep, '/')
+                    yield entry.path, f'{config_name}/{rel_path}', entry.stat()
+    
+    def _compute_manifest(self):
+        """Map every backed up file to its size and modification time"""
+        return {
+            file_path: [st.st_size, st.st_mtime_ns]
+            for file_path, arcname, st in self._iter_config_files()
+        }
+    
+    def _load_manifest(self, folder_name):
+        """Load manifest saved by the last successful upload to a folder"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = load_json(f)
+        except (OSError, ValueError):
+            return None
+        # A manifest recorded for another backup folder says nothing about this one
+        if manifest.get('folder') != folder_name:
+            return None
+        return manifest
+    
+    def _save_manifest(self, manifest, file_id, folder_name):
+        """Save manifest of the backup that was just uploaded"""
+        try:
+            with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                dump_json({'folder': folder_name, 'file_id': file_id, 'files': manifest}, f)
+        except OSError as e:
+            print(f"Error saving sync manifest: {e}")
     
     def _get_cursor_version(self):
         """Get Cursor version (if possible)"""
@@ -208,50 +649,132 @@ class CursorSyncManager:
             settings_path = self.cursor_config_paths.get('settings')
             if os.path.exists(settings_path):
                 with open(settings_path, 'r') as f:
-                    settings = json.load(f)
+                    settings = load_json(f)
                     return settings.get('version', 'unknown')
         except:
             pass
         return 'unknown'
     
-    def upload_to_drive(self, file_path, custom_filename=None, folder_name='Cursor Backups'):
-        """Upload backup file to Google Drive"""
+    def upload_to_drive(self, backup_file, filename, folder_name='Cursor Backups'):
+        """Upload backup file object to Google Drive"""
+        from googleapiclient.errors import HttpError
+        
         if not self.service:
             raise Exception("Please authenticate with Google Drive first")
         
         # Find or create folder
         folder_id = self._get_or_create_folder(folder_name)
         
-        # Upload file - use custom filename or original filename
-        display_name = custom_filename if custom_filename else os.path.basename(file_path)
         file_metadata = {
-            'name': display_name,
+            'name': filename,
             'parents': [folder_id]
         }
         
-        media = MediaFileUpload(file_path, resumable=True)
+        try:
+            file_id = self._put_file(backup_file, file_metadata)
+        except HttpError as e:
+            # Cached folder was deleted on Drive, resolve it again and retry once
+            if not self._invalidate_folder(folder_name, e):
+                raise
+            file_metadata['parents'] = [self._get_or_create_folder(folder_name)]
+            file_id = self._put_file(backup_file, file_metadata)
         
-        file = self.service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id'
-        ).execute()
+        print(f"File uploaded to Google Drive, ID: {file_id}")
+        return file_id
+    
+    def _put_file(self, file_obj, file_metadata, mimetype='application/zip', file_id=None):
+        """Upload file object as a new Drive file, or replace the content of file_id"""
+        from googleapiclient.http import MediaIoBaseUpload
+        
+        # A resumable session costs an extra round-trip, only worth it for large files
+        file_obj.seek(0, io.SEEK_END)
+        resumable = file_obj.tell() >= RESUMABLE_THRESHOLD
+        file_obj.seek(0)
+        media = MediaIoBaseUpload(file_obj, mimetype=mimetype,
+                                  chunksize=UPLOAD_CHUNK_SIZE, resumable=resumable)
+        
+        if file_id:
+            # Parents cannot be set in an update request
+            body = {k: v for k, v in file_metadata.items() if k != 'parents'}
+            request = self.service.files().update(
+                fileId=file_id,
+                body=body,
+                media_body=media,
+                fields='id',
+                supportsAllDrives=False
+            )
+        else:
+            request = self.service.files().create(
+                body=file_metadata,
+                media_body=media,
+                fields='id',
+                supportsAllDrives=False
+            )
+        
+        if not resumable:
+            return request.execute().get('id')
+        
+        file = None
+        while file is None:
+            status, file = request.next_chunk()
+            if status:
+                print(f"Upload progress: {int(status.progress() * 100)}%")
         
-        print(f"File uploaded to Google Drive, ID: {file.get('id')}")
         return file.get('id')
     
+    def _download_file(self, file_id, out):
+        """Download Drive file content into a writable file object"""
+        from googleapiclient.http import MediaIoBaseDownload
+        
+        request = self.service.files().get_media(fileId=file_id, supportsAllDrives=False)
+        downloader = MediaIoBaseDownload(out, request)
+        done = False
+        while done is False:
+            status, done = downloader.next_chunk()
+            print(f"Download progress: {int(status.progress() * 100)}%")
+    
+    def _invalidate_folder(self, folder_name, error):
+        """Drop cached folder ID if the API reported it as not found"""
+        if error.resp.status == 404 and folder_name in self._folder_id_cache:
+            del self._folder_id_cache[folder_name]
+            return True
+        return False
+    
     def _get_or_create_folder(self, folder_name):
         """Get or create Google Drive folder"""
+        from googleapiclient.errors import HttpError
+        
+        # Folder IDs do not change, so only query Drive once per folder
+        if folder_name in self._folder_id_cache:
+            return self._folder_id_cache[folder_name]
+        
+        # Check the ID saved by a previous run, a direct lookup is cheaper than a search
+        saved_id = self._saved_folder_ids.get(folder_name)
+        if saved_id:
+            try:
+                folder = self.service.files().get(fileId=saved_id, fields='id,trashed',
+                                                   supportsAllDrives=False).execute()
+                if not folder.get('trashed'):
+                    self._folder_id_cache[folder_name] = saved_id
+                    return saved_id
+            except HttpError as e:
+                if e.resp.status != 404:
+                    raise
+        
         # Search for existing folder
         results = self.service.files().list(
-            q=f"name='{folder_name}' and mimeType='application/vnd.google-apps.folder'",
+            q=f"name={_quote(folder_name)} and mimeType='application/vnd.google-apps.folder' and trashed=false",
             spaces='drive',
+            corpora='user',
+            includeItemsFromAllDrives=False,
+            supportsAllDrives=False,
             fields='files(id, name)'
         ).execute()
         
         folders = results.get('files', [])
         
         if folders:
+            self._remember_folder(folder_name, folders[0]['id'])
             return folders[0]['id']
         
         # Create new folder
@@ -262,25 +785,39 @@ class CursorSyncManager:
         
         folder = self.service.files().create(
             body=folder_metadata,
-            fields='id'
+            fields='id',
+            supportsAllDrives=False
         ).execute()
         
         print(f"Created folder: {folder_name}")
+        self._remember_folder(folder_name, folder.get('id'))
         return folder.get('id')
     
+    def _remember_folder(self, folder_name, folder_id):
+        """Cache folder ID for this process and save it for later runs"""
+        self._folder_id_cache[folder_name] = folder_id
+        if self._saved_folder_ids.get(folder_name) != folder_id:
+            self._saved_folder_ids[folder_name] = folder_id
+            self._update_state('drive_folder_ids', self._saved_folder_ids)
+    
     def download_latest_backup(self, folder_name='Cursor Backups'):
         """Download the latest backup file"""
+        from googleapiclient.errors import HttpError
+        
         if not self.service:
             raise Exception("Please authenticate with Google Drive first")
         
         folder_id = self._get_or_create_folder(folder_name)
         
         # Search for backup files
-        results = self.service.files().list(
-            q=f"parents='{folder_id}' and name contains 'cursor_backup'",
-            orderBy='createdTime desc',
-            fields='files(id, name, createdTime)'
-        ).execute()
+        # Only the newest backup is used
+        fields = 'files(id,name,createdTime,md5Checksum,size)'
+        try:
+            results = self._list_backups(folder_id, page_size=1, fields=fields)
+        except HttpError as e:
+            if not self._invalidate_folder(folder_name, e):
+                raise
+            results = self._list_backups(self._get_or_create_folder(folder_name), page_size=1, fields=fields)
         
         files = results.get('files', [])
         
@@ -292,65 +829,234 @@ class CursorSyncManager:
         file_id = latest_file['id']
         filename = latest_file['name']
         
-        # Download file
-        request = self.service.files().get_media(fileId=file_id)
+        # Skip the download when this backup is the one restored last time
+        md5 = latest_file.get('md5Checksum')
+        if md5 and md5 == self._last_applied_md5:
+            print(f"Latest backup {filename} is already applied")
+            return None
+        self._downloaded_md5 = md5
         
+        # Download file
         with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as temp_file:
-            downloader = MediaIoBaseDownload(temp_file, request)
-            done = False
-            while done is False:
-                status, done = downloader.next_chunk()
-                print(f"Download progress: {int(status.progress() * 100)}%")
+            self._download_file(file_id, temp_file)
             
             print(f"Downloaded: {filename}")
             return temp_file.name
     
+    def _list_backups(self, folder_id, page_size, fields='files(id, name, createdTime)', page_token=None):
+        """List backup files in folder, newest first"""
+        return self.service.files().list(
+            q=f"{_quote(folder_id)} in parents and name contains 'cursor_backup' and trashed=false",
+            spaces='drive',
+            corpora='user',
+            includeItemsFromAllDrives=False,
+            supportsAllDrives=False,
+            orderBy='createdTime desc',
+            pageSize=page_size,
+            pageToken=page_token,
+            fields=fields
+        ).execute()
+    
+    def prune_old_backups(self, keep=5, folder_name='Cursor Backups'):
+        """Delete all but the newest backups, returning (deleted names, [(name, error)] failures)"""
+        if not self.service:
+            raise Exception("Please authenticate with Google Drive first")
+        
+        folder_id = self._get_or_create_folder(folder_name)
+        
+        # Sorted server-side so only IDs and names are needed. The first page usually
+        # holds every backup; longer histories are fetched in pages of the maximum size
+        results = self._list_backups(folder_id, page_size=max(keep + 1, 25),
+                                     fields='nextPageToken, files(id,name)')
+        files = results.get('files', [])
+        
+        while results.get('nextPageToken'):
+            results = self._list_backups(folder_id, page_size=MAX_PAGE_SIZE,
+                                         fields='nextPageToken, files(id,name)',
+                                         page_token=results['nextPageToken'])
+            files.extend(results.get('files', []))
+        
+        return self._delete_files(files[keep:])
+    
+    def _delete_files(self, files):
+        """Delete files in batch requests, returning (deleted names, [(name, error)] failures)"""
+        files = iter(files)
+        names = {}
+        deleted = []
+        failed = []
+        
+        def on_delete(request_id, response, exception):
+            if exception is not None:
+                failed.append((names[request_id], exception))
+            else:
+                deleted.append(names[request_id])
+        
+        # One round-trip per batch instead of one per file
+        chunk = list(islice(files, BATCH_SIZE))
+        while chunk:
+            batch = self.service.new_batch_http_request(callback=on_delete)
+            for file_to_delete in chunk:
+                names[file_to_delete['id']] = file_to_delete['name']
+                batch.add(self.service.files().delete(fileId=file_to_delete['id'], supportsAllDrives=False),
+                          request_id=file_to_delete['id'])
+            batch.execute()
+            chunk = list(islice(files, BATCH_SIZE))
+        
+        return deleted, failed
+    
     def restore_from_backup(self, backup_path):
         """Restore settings from backup file"""
         if not os.path.exists(backup_path):
             raise Exception(f"Backup file does not exist: {backup_path}")
         
+        if not zipfile.is_zipfile(backup_path):
+            raise Exception(f"Backup file is not a zip archive: {backup_path}")
+        
         with zipfile.ZipFile(backup_path, 'r') as zipf:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                zipf.extractall(temp_dir)
+            # Group archive members by configuration name (the first path component)
+            members = {}
+            for info in zipf.infolist():
+                config_name, sep, rel_path = info.filename.partition('/')
+                if sep and rel_path and not info.is_dir():
+                    members.setdefault(config_name, []).append((rel_path, info))
+            
+            # Fail before touching any settings if a member can't be decompressed here
+            representatives = {info.compress_type: info for info in zipf.infolist()}
+            try:
+                for info in representatives.values():
+                    zipf.open(info).close()
+            except NotImplementedError:
+                # e.g. a Zstandard backup restored on Python older than 3.14
+                raise Exception("Backup uses a compression method not supported by this Python version")
+            
+            # Extract every configuration into a staging sibling first, in parallel, with files
+            # written on a shared pool; live settings are only touched once all of it decompressed
+            staged = {}
+            try:
+                with ThreadPoolExecutor(max_workers=RESTORE_WORKERS) as file_executor, \
+                        ThreadPoolExecutor(max_workers=len(self.cursor_config_paths) or 1) as config_executor:
+                    futures = {
+                        config_name: config_executor.submit(self._stage_config, config_name, config_path,
+                                                            zipf, members[config_name], file_executor)
+                        for config_name, config_path in self.cursor_config_paths.items()
+                        if config_name in members
+                    }
+                    errors = []
+                    for config_name, future in futures.items():
+                        try:
+                            staged[config_name] = future.result()
+                        except Exception as e:
+                            errors.append(e)
+                    if errors:
+                        raise errors[0]
                 
-                # Restore each configuration file
-                for config_name, config_path in self.cursor_config_paths.items():
-                    backup_config_path = os.path.join(temp_dir, config_name)
-                    
-                    if os.path.exists(backup_config_path):
-                        # Backup current settings
-                        if os.path.exists(config_path):
-                            backup_current = f"{config_path}.backup_{int(time.time())}"
-                            if os.path.isfile(config_path):
-                                shutil.copy2(config_path, backup_current)
-                            else:
-                                shutil.copytree(config_path, backup_current)
-                        
-                        # Restore settings
-                        if os.path.isfile(backup_config_path):
-                            os.makedirs(os.path.dirname(config_path), exist_ok=True)
-                            shutil.copy2(backup_config_path, config_path)
-                        elif os.path.isdir(backup_config_path):
-                            if os.path.exists(config_path):
-                                shutil.rmtree(config_path)
-                            shutil.copytree(backup_config_path, config_path)
-                        
-                        print(f"Restored: {config_name}")
-    
-    def sync_up(self):
+                for config_name, staging_path in staged.items():
+                    self._swap_config(self.cursor_config_paths[config_name], staging_path)
+                    print(f"Restored: {config_name}")
+            finally:
+                # Staging copies are left over only when restore failed
+                for staging_path in staged.values():
+                    if os.path.lexists(staging_path):
+                        _remove_path(staging_path)
+    
+    def _stage_config(self, config_name, config_path, zipf, members, executor):
+        """Extract one configuration file or directory next to its live path, returning the staging path"""
+        # Single-file configs are archived as <config_name>/<file name>. The file name may differ
+        # from the local one (custom paths), so decide from the local path and the member layout
+        single_member = len(members) == 1 and '/' not in members[0][0]
+        is_file_config = single_member and not os.path.isdir(config_path) and (
+            os.path.isfile(config_path) or config_name in FILE_CONFIGS)
+        
+        # Normalize so directory paths ending in a separator get a sibling staging path
+        staging_path = f"{os.path.normpath(config_path)}.restore_tmp"
+        if os.path.lexists(staging_path):
+            # Left behind by an interrupted restore
+            _remove_path(staging_path)
+        
+        try:
+            if is_file_config:
+                os.makedirs(os.path.dirname(staging_path), exist_ok=True)
+                _extract_member(zipf, members[0][1], staging_path)
+            else:
+                targets = []
+                for rel_path, info in members:
+                    target = os.path.normpath(os.path.join(staging_path, rel_path))
+                    # Never write outside the configuration directory
+                    if not target.startswith(staging_path + os.sep):
+                        print(f"Skipping unsafe archive member: {info.filename}")
+                        continue
+                    targets.append((info, target))
+                
+                os.makedirs(staging_path)
+                for directory in {os.path.dirname(target) for info, target in targets}:
+                    os.makedirs(directory, exist_ok=True)
+                
+                futures = [executor.submit(_extract_member, zipf, info, target) for info, target in targets]
+                for future in as_completed(futures):
+                    future.result()
+        except Exception:
+            if os.path.lexists(staging_path):
+                _remove_path(staging_path)
+            raise
+        
+        return staging_path
+    
+    def _swap_config(self, config_path, staging_path):
+        """Move current settings aside and put the staged restore in their place"""
+        current_path = os.path.normpath(config_path)
+        if not os.path.lexists(current_path):
+            os.replace(staging_path, current_path)
+            return
+        
+        # Backup current settings by moving them aside, a single rename instead of a full copy
+        backup_current = _unused_path(f"{current_path}.backup_{int(time.time())}")
+        try:
+            os.replace(current_path, backup_current)
+        except OSError as e:
+            # Only copy when a rename is impossible (another file system, files held open
+            # on Windows); anything else must not be merged over an existing backup
+            if e.errno not in RENAME_FALLBACK_ERRNOS:
+                raise
+            if os.path.isfile(current_path):
+                _copy_file(current_path, backup_current)
+            else:
+                with ThreadPoolExecutor(max_workers=RESTORE_WORKERS) as executor:
+                    _parallel_copytree(current_path, backup_current, executor)
+            if os.path.isdir(current_path):
+                shutil.rmtree(current_path)
+            os.replace(staging_path, current_path)
+            return
+        
+        try:
+            os.replace(staging_path, current_path)
+        except OSError:
+            # Put the user's settings back rather than leaving the path empty
+            os.replace(backup_current, current_path)
+            raise
+    
+    def sync_up(self, folder_name='Cursor Backups'):
         """Sync to cloud"""
         print("Starting to sync Cursor settings to Google Drive...")
         
+        # Skip archiving and uploading if nothing changed since the last upload
+        manifest = self._compute_manifest()
+        previous = self._load_manifest(folder_name)
+        if previous and previous.get('files') == manifest:
+            print("No changes since last sync, skipping upload")
+            return previous.get('file_id')
+        
         # Create backup file
-        backup_path, backup_filename = self.create_backup_archive()
-        print(f"Created backup file: {backup_path}")
+        backup_file, backup_filename = self.create_backup_archive()
+        print(f"Created backup file: {backup_filename}")
         
         # Upload to Google Drive (using correct filename)
-        file_id = self.upload_to_drive(backup_path, backup_filename)
+        try:
+            file_id = self.upload_to_drive(backup_file, backup_filename, folder_name)
+        finally:
+            # Release the in-memory/spooled backup
+            backup_file.close()
         
-        # Clean up temporary file
-        os.unlink(backup_path)
+        self._save_manifest(manifest, file_id, folder_name)
         
         print("Sync completed!")
         return file_id
@@ -369,9 +1075,197 @@ class CursorSyncManager:
             # Clean up temporary file
             os.unlink(backup_path)
             
+            # Remember what was restored so an unchanged backup is not downloaded again
+            if self._downloaded_md5:
+                self._last_applied_md5 = self._downloaded_md5
+                self._update_state('last_applied_md5', self._downloaded_md5)
+            
             print("Sync completed!")
         else:
-            print("No backup files found")
+            print("Nothing to restore")
+    
+    def _compute_subtree_hashes(self, previous_files=None):
+        """Hash the content of each configuration subtree, returning (hashes, file manifests)
+        
+        Files whose size and mtime match previous_files reuse the recorded digest instead of being read.
+        """
+        previous_files = previous_files or {}
+        entries = sorted(self._iter_config_files(), key=lambda e: e[1])
+        
+        # Hash new and changed files in parallel; blake3 and hashlib release the GIL while hashing
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+            pending = {}
+            for file_path, arcname, st in entries:
+                known = previous_files.get(arcname.split('/', 1)[0], {}).get(arcname)
+                if not (known and known[0] == st.st_size and known[1] == st.st_mtime_ns):
+                    pending[arcname] = executor.submit(_file_digest, file_path)
+            
+            digests = {}
+            files = {}
+            for file_path, arcname, st in entries:
+                config_name = arcname.split('/', 1)[0]
+                if arcname in pending:
+                    try:
+                        file_digest = pending[arcname].result()
+                    except FileNotFoundError:
+                        print(f"Skipping file removed during backup: {file_path}")
+                        continue
+                else:
+                    file_digest = previous_files[config_name][arcname][2]
+                
+                files.setdefault(config_name, {})[arcname] = [st.st_size, st.st_mtime_ns, file_digest]
+                digests.setdefault(config_name, _new_hash())
+                digests[config_name].update(f'{arcname}\0{file_digest}\n'.encode('utf-8'))
+        # Prefix the algorithm so hashes from machines without blake3 never compare equal by accident
+        return {name: f'{HASH_NAME}:{h.hexdigest()}' for name, h in digests.items()}, files
+    
+    def _find_index(self, folder_id):
+        """Find the incremental sync index file, returning (file_id, index)"""
+        results = self.service.files().list(
+            q=f"{_quote(folder_id)} in parents and name={_quote(INDEX_FILENAME)} and trashed=false",
+            spaces='drive',
+            corpora='user',
+            includeItemsFromAllDrives=False,
+            supportsAllDrives=False,
+            pageSize=1,
+            fields='files(id,md5Checksum)'
+        ).execute()
+        
+        files = results.get('files', [])
+        if not files:
+            return None, {'subtrees': {}}
+        
+        # The index lists every backed up file, only download it when it differs from the local copy
+        file_id = files[0]['id']
+        md5 = files[0].get('md5Checksum')
+        cached = self._load_index_cache()
+        if md5 and cached.get('id') == file_id and cached.get('md5') == md5:
+            return file_id, cached['index']
+        
+        buf = io.BytesIO()
+        self._download_file(file_id, buf)
+        data = buf.getvalue()
+        index = load_json(io.BytesIO(data))
+        self._save_index_cache(file_id, hashlib.md5(data).hexdigest(), index)
+        return file_id, index
+    
+    def _load_index_cache(self):
+        """Load the local copy of the incremental sync index"""
+        try:
+            with open(self.index_cache_path, 'r', encoding='utf-8') as f:
+                return load_json(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_index_cache(self, file_id, md5, index):
+        """Save a local copy of the incremental sync index with the MD5 of its Drive content"""
+        try:
+            with open(self.index_cache_path, 'w', encoding='utf-8') as f:
+                dump_json({'id': file_id, 'md5': md5, 'index': index}, f)
+        except OSError as e:
+            print(f"Error saving incremental sync index: {e}")
+    
+    def sync_up_incremental(self, folder_name='Cursor Backups'):
+        """Sync to cloud, uploading only configuration subtrees that changed"""
+        if not self.service:
+            raise Exception("Please authenticate with Google Drive first")
+        
+        print("Starting incremental sync of Cursor settings to Google Drive...")
+        
+        folder_id = self._get_or_create_folder(folder_name)
+        index_id, index = self._find_index(folder_id)
+        subtrees = index.get('subtrees', {})
+        
+        # Per-file digests recorded by the last upload let unchanged files skip hashing;
+        # they are only reusable when computed with the same hash algorithm
+        previous_files = {
+            name: stored.get('files', {}) for name, stored in subtrees.items()
+            if stored.get('hash', '').startswith(f'{HASH_NAME}:')
+        }
+        hashes, files = self._compute_subtree_hashes(previous_files)
+        
+        # The index is only uploaded again when something recorded in it changed
+        index_changed = index_id is None
+        
+        for name, digest in hashes.items():
+            stored = subtrees.get(name)
+            if stored and stored.get('hash') == digest:
+                if stored.get('files') != files[name]:
+                    # Same content with new sizes or mtimes, keep the stats current for the next run
+                    stored['files'] = files[name]
+                    index_changed = True
+                print(f"Unchanged: {name}")
+                continue
+            
+            # Each subtree is its own Drive file, replaced in place when it changes
+            backup_file, _ = self.create_backup_archive(config_names=[name])
+            try:
+                file_metadata = {
+                    'name': SUBTREE_FILENAME.format(name),
+                    'parents': [folder_id],
+                    'appProperties': {'hash': digest, 'subtree': name}
+                }
+                file_id = self._put_file(backup_file, file_metadata,
+                                         file_id=stored.get('id') if stored else None)
+            finally:
+                backup_file.close()
+            
+            subtrees[name] = {'id': file_id, 'hash': digest, 'files': files[name]}
+            index_changed = True
+            print(f"Uploaded: {name}")
+        
+        # Drop subtrees that no longer exist locally
+        removed = [{'id': stored['id'], 'name': name} for name, stored in subtrees.items() if name not in hashes]
+        if removed:
+            deleted, failed = self._delete_files(removed)
+            for name in deleted:
+                del subtrees[name]
+                index_changed = True
+                print(f"Removed: {name}")
+            # Subtrees that could not be deleted stay in the index and are retried next time
+            for name, error in failed:
+                print(f"Failed to remove {name}: {error}")
+        
+        if not index_changed:
+            print("No changes since last sync, index left as is")
+            return index_id
+        
+        index = {
+            'timestamp': datetime.now().strftime('%Y%m%d_%H%M%S'),
+            'subtrees': subtrees
+        }
+        data = json.dumps(index, indent=2).encode('utf-8')
+        index_id = self._put_file(io.BytesIO(data), {'name': INDEX_FILENAME, 'parents': [folder_id]},
+                                  mimetype='application/json', file_id=index_id)
+        self._save_index_cache(index_id, hashlib.md5(data).hexdigest(), index)
+        
+        print("Sync completed!")
+        return index_id
+    
+    def sync_down_incremental(self, folder_name='Cursor Backups'):
+        """Sync from cloud using the incremental sync index"""
+        if not self.service:
+            raise Exception("Please authenticate with Google Drive first")
+        
+        print("Starting incremental sync of Cursor settings from Google Drive...")
+        
+        folder_id = self._get_or_create_folder(folder_name)
+        index_id, index = self._find_index(folder_id)
+        
+        if index_id is None:
+            print("No incremental backup found")
+            return
+        
+        for name, stored in index.get('subtrees', {}).items():
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as temp_file:
+                self._download_file(stored['id'], temp_file)
+            
+            try:
+                self.restore_from_backup(temp_file.name)
+            finally:
+                os.unlink(temp_file.name)
+        
+        print("Sync completed!")
 
 def main():
     import argparse
@@ -383,6 +1277,8 @@ def main():
                        help='Google API credentials file path')
     parser.add_argument('--token', default='token.json',
                        help='Authentication token file path')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Upload/download only the settings subtrees that changed')
     
     args = parser.parse_args()
     
@@ -400,11 +1296,17 @@ def main():
     
     elif args.action == 'up':
         sync_manager.authenticate()
-        sync_manager.sync_up()
+        if args.incremental:
+            sync_manager.sync_up_incremental()
+        else:
+            sync_manager.sync_up()
     
     elif args.action == 'down':
         sync_manager.authenticate()
-        sync_manager.sync_down()
+        if args.incremental:
+            sync_manager.sync_down_incremental()
+        else:
+            sync_manager.sync_down()
     
     elif args.action == 'validate':
         sync_manager.print_path_validation()